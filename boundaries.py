@@ -0,0 +1,680 @@
+# boundaries.py
+"""
+Ward / constituency boundaries for the Regional Map View.
+
+The TopoJSON files in Maps/ are decoded with NumPy (see read_topojson)
+and compiled into a single GeoParquet store
+(with normalised name columns, per-row bounding boxes and a pyramid of
+simplified geometries) the first time they are needed, and the store is
+cached for the lifetime of the process.
+A server restart then only reads the store, not the TopoJSON.
+
+Build the store ahead of time with:
+
+    python boundaries.py build
+
+and compare the decoder with GDAL with:
+
+    python boundaries.py bench
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+MAPS_DIR = "Maps"
+STORE_DIR = ".cache"
+
+# Simplification tolerances (degrees) kept in the store, finest first.
+# Bump STORE_VERSION when the store layout changes so old stores rebuild.
+SIMPLIFY_LEVELS = (0.0005, 0.002, 0.005, 0.01, 0.02)
+STORE_VERSION = 3
+
+# Uploads whose area codes are kept (least recently used dropped past this)
+CODES_CACHE_ENTRIES = 4
+
+_lock = threading.Lock()
+_digests = {}    # path -> (mtime_ns, size, sha1 of contents)
+_loaded = {}     # store fingerprint -> combined GeoDataFrame
+_indexes = {}    # (id(frame), region mapping) -> {region or ward name: row positions}
+_centroids = {}  # (id(frame), row positions, tolerance) -> centroid Point
+_codes = OrderedDict()  # (table content hash, column, id(frame), region mapping) -> (codes, spread)
+_ward_points = {}  # id(frame) -> (frame, {ward name: {"lat", "lon"}})
+
+
+def boundary_files(folder=MAPS_DIR):
+    """
+    Boundary files in `folder`, sorted so the combined frame is stable
+    """
+    return sorted(glob.glob(os.path.join(folder, "*.json")))
+
+
+def normalize_name(s):
+    """
+    Lookup key for ward / constituency / region names
+    """
+    if s is None or pd.isna(s):
+        return ""
+    s = str(s).strip().lower().replace("_", " ")
+    return re.sub(r"\s+", " ", s)
+
+
+def _file_digest(path):
+    """
+    Content hash of a file, recomputed only when its mtime or size changes
+    """
+    stat = os.stat(path)
+    cached = _digests.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    _digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+
+def _distinct_files(files):
+    """
+    {content hash: first path with that content}, in file order
+    """
+    distinct = {}
+    for path in files:
+        distinct.setdefault(_file_digest(path), path)
+    return distinct
+
+
+def _fingerprint(distinct):
+    key = f"v{STORE_VERSION}:{SIMPLIFY_LEVELS}:" + "".join(distinct)
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def lod_column(tolerance):
+    return f"geometry_{tolerance:g}"
+
+
+def store_path(fingerprint, store_dir=STORE_DIR):
+    return os.path.join(store_dir, f"boundaries-{fingerprint}.parquet")
+
+
+# ---------------- TopoJSON ----------------
+def _split_arcs(raw):
+    """
+    Pull the top-level "arcs" array out of raw TopoJSON without building a
+    Python list per point: bracket depth is tracked with NumPy (ignoring
+    brackets inside strings) and the numbers are parsed in one call.
+    Returns (rest of the document, (n, 2) positions, points per arc), or
+    None when the layout is not the plain two-number-per-point form.
+    """
+    buf = np.frombuffer(raw, dtype=np.uint8)
+    quote = buf == ord('"')
+    quote[1:] &= buf[:-1] != ord("\\")
+    in_string = np.cumsum(quote) % 2 == 1
+
+    step = np.zeros(len(buf), dtype=np.int8)
+    step[(buf == ord("[")) | (buf == ord("{"))] = 1
+    step[(buf == ord("]")) | (buf == ord("}"))] = -1
+    step[in_string] = 0
+    depth = np.cumsum(step, dtype=np.int32)
+
+    key = next((m for m in re.finditer(rb'"arcs"\s*:\s*\[', raw) if depth[m.start()] == 1), None)
+    if key is None:
+        return None
+    start = key.end() - 1
+    level = depth[start]
+    end = start + int(np.argmax(depth[start:] < level))
+
+    closes = buf[start:end] == ord("]")
+    inner = depth[start:end]
+    point_ends = np.flatnonzero(closes & (inner == level + 1))
+    arc_ends = np.flatnonzero(closes & (inner == level))
+    lengths = np.diff(np.searchsorted(point_ends, arc_ends), prepend=0)
+
+    text = raw[start:end + 1].translate(bytes.maketrans(b"[]", b"  "))
+    numbers = np.fromstring(text, sep=",") if len(point_ends) else np.empty(0)
+    if len(numbers) != 2 * len(point_ends) or lengths.sum() != len(point_ends):
+        return None
+    return raw[:start] + b"[]" + raw[end + 1:], numbers.reshape(-1, 2), lengths
+
+
+def load_topology(path):
+    """
+    TopoJSON document plus its arcs as (positions, points per arc) arrays;
+    the document's own "arcs" entry is left empty.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    split = _split_arcs(raw)
+    if split is not None:
+        rest, positions, lengths = split
+        return json.loads(rest), positions, lengths
+
+    topology = json.loads(raw)
+    arcs = topology.get("arcs") or []
+    topology["arcs"] = []
+    lengths = np.fromiter((len(a) for a in arcs), dtype=np.intp, count=len(arcs))
+    positions = np.array([p[:2] for a in arcs for p in a], dtype=np.float64).reshape(-1, 2)
+    return topology, positions, lengths
+
+
+def decode_arcs(positions, lengths, transform=None):
+    """
+    All arcs as one (n, 2) coordinate array plus the offset of each arc in
+    it: delta-decoded and dequantised when the topology has a transform.
+    """
+    offsets = np.zeros(len(lengths) + 1, dtype=np.intp)
+    np.cumsum(lengths, out=offsets[1:])
+    if not transform:
+        return positions, offsets
+
+    # Positions are deltas from the previous point of the same arc
+    total = np.cumsum(positions, axis=0)
+    before = np.zeros((len(lengths), 2))
+    before[1:] = total[offsets[1:-1] - 1]
+    coords = total - np.repeat(before, lengths, axis=0)
+    return coords * transform["scale"] + transform["translate"], offsets
+
+
+def _ring_points(refs, ring_of_ref, offsets):
+    """
+    Point positions of every ring, given the arc references of all rings in
+    ring order. Negative references (~i) walk arc i backwards; each arc
+    after the first in a ring skips its first point, which repeats the
+    previous arc's last one.
+    """
+    refs = np.asarray(refs, dtype=np.intp)
+    arc = np.where(refs < 0, ~refs, refs)
+    reverse = refs < 0
+    first = np.ones(len(refs), dtype=bool)
+    first[1:] = ring_of_ref[1:] != ring_of_ref[:-1]
+
+    length = offsets[arc + 1] - offsets[arc]
+    skip = (~first).astype(np.intp)
+    count = length - skip
+
+    # k runs skip..length-1 within each reference
+    ref_of_point = np.repeat(np.arange(len(refs)), count)
+    k = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    k += skip[ref_of_point]
+    start, n = offsets[arc][ref_of_point], length[ref_of_point]
+    points = np.where(reverse[ref_of_point], start + n - 1 - k, start + k)
+    return points, ring_of_ref[ref_of_point]
+
+
+class _Rings:
+    """
+    Ring / polygon structure of one TopoJSON object, independent of the
+    arc coordinates, so the same structure can be assembled from the full
+    arcs and from each simplified copy of them.
+    """
+
+    def __init__(self, geometries):
+        refs, ring_of_ref, part_of_ring, geom_of_part = [], [], [], []
+        ring = part = 0
+        self.kinds = []
+        for i, g in enumerate(geometries):
+            kind = g.get("type")
+            self.kinds.append(kind)
+            if kind == "Polygon":
+                polygons = [g["arcs"]]
+            elif kind == "MultiPolygon":
+                polygons = g["arcs"]
+            else:
+                continue
+            for polygon in polygons:
+                for ring_arcs in polygon:
+                    refs.extend(ring_arcs)
+                    ring_of_ref.extend([ring] * len(ring_arcs))
+                    part_of_ring.append(part)
+                    ring += 1
+                geom_of_part.append(i)
+                part += 1
+
+        self.refs = np.array(refs, dtype=np.intp)
+        self.ring_of_ref = np.array(ring_of_ref, dtype=np.intp)
+        self.part_of_ring = np.array(part_of_ring, dtype=np.intp)
+        self.geom_of_part = np.array(geom_of_part, dtype=np.intp)
+        self.n_rings = ring
+
+    def assemble(self, coords, offsets, fallback=None):
+        """
+        Geometry array (one per TopoJSON geometry) from arc coordinates.
+        Rings with fewer than four points are taken from `fallback`, an
+        earlier (points, ring ids, coords) result, so simplification never
+        collapses a ring.
+        """
+        points, ring_of_point = _ring_points(self.refs, self.ring_of_ref, offsets)
+        points = coords[points]
+        if fallback is not None:
+            short = np.bincount(ring_of_point, minlength=self.n_rings) < 4
+            if short.any():
+                keep = ~short[ring_of_point]
+                full_points, full_rings = fallback
+                take = short[full_rings]
+                points = np.concatenate([points[keep], full_points[take]])
+                ring_of_point = np.concatenate([ring_of_point[keep], full_rings[take]])
+                order = np.argsort(ring_of_point, kind="stable")
+                points, ring_of_point = points[order], ring_of_point[order]
+
+        rings = shapely.linearrings(points, indices=ring_of_point)
+        parts = shapely.polygons(rings, indices=self.part_of_ring)
+
+        geoms = np.full(len(self.kinds), None, dtype=object)
+        kinds = np.array(self.kinds, dtype=object)
+        single = np.flatnonzero(kinds == "Polygon")
+        if len(single):
+            geoms[single] = parts[np.isin(self.geom_of_part, single)]
+        multi = np.isin(self.geom_of_part, np.flatnonzero(kinds == "MultiPolygon"))
+        if multi.any():
+            owners, indices = np.unique(self.geom_of_part[multi], return_inverse=True)
+            geoms[owners] = shapely.multipolygons(parts[multi], indices=indices)
+        return geoms, (points, ring_of_point)
+
+
+def read_topojson(path, levels=()):
+    """
+    GeoDataFrame of the first object in a TopoJSON file, like
+    gpd.read_file() but decoded directly with NumPy.
+
+    Each tolerance in `levels` adds a simplified geometry column. The
+    shared arcs are simplified once and then assembled, so neighbouring
+    wards stay gap-free. Files that are not polygon topologies go through
+    gpd.read_file().
+    """
+    topology, positions, lengths = load_topology(path)
+    objects = topology.get("objects") or {}
+    collection = next(iter(objects.values()), None)
+    geometries = (collection or {}).get("geometries")
+    if (
+        topology.get("type") != "Topology"
+        or geometries is None
+        or any(g.get("type") not in ("Polygon", "MultiPolygon", None) for g in geometries)
+    ):
+        gdf = gpd.read_file(path)
+        for tolerance in levels:
+            gdf[lod_column(tolerance)] = gdf.geometry.simplify(tolerance=tolerance)
+        return gdf
+
+    coords, offsets = decode_arcs(positions, lengths, topology.get("transform"))
+    rings = _Rings(geometries)
+    geoms, full = rings.assemble(coords, offsets)
+
+    records = [{"id": g.get("id"), **(g.get("properties") or {})} for g in geometries]
+    gdf = gpd.GeoDataFrame(pd.DataFrame.from_records(records), geometry=geoms)
+
+    if levels:
+        lines = shapely.linestrings(coords, indices=np.repeat(np.arange(len(offsets) - 1), np.diff(offsets)))
+        for tolerance in levels:
+            simplified, arc_of_point = shapely.get_coordinates(
+                shapely.simplify(lines, tolerance), return_index=True
+            )
+            simplified_offsets = np.zeros(len(offsets), dtype=np.intp)
+            np.cumsum(np.bincount(arc_of_point, minlength=len(lines)), out=simplified_offsets[1:])
+            gdf[lod_column(tolerance)] = gpd.GeoSeries(
+                rings.assemble(simplified, simplified_offsets, fallback=full)[0], index=gdf.index
+            )
+    return gdf
+
+
+def compile_boundaries(distinct):
+    """
+    Parse each distinct file once and add the lookup columns:
+    normalised ward / constituency names, the bounding box of each row and
+    one simplified geometry column per level in SIMPLIFY_LEVELS.
+    """
+    frames = [read_topojson(path, SIMPLIFY_LEVELS) for path in distinct.values()]
+    if not frames:
+        return gpd.GeoDataFrame(geometry=[])
+
+    gdf = gpd.GeoDataFrame(pd.concat(frames, ignore_index=True), crs=frames[0].crs)
+
+    for col, out in [("WD13NM", "ward_name"), ("PCON13NM", "constituency_name")]:
+        names = gdf[col] if col in gdf.columns else pd.Series(None, index=gdf.index, dtype=object)
+        gdf[out] = names.map(normalize_name)
+
+    bounds = gdf.geometry.bounds
+    gdf["minx"], gdf["miny"], gdf["maxx"], gdf["maxy"] = (
+        bounds["minx"], bounds["miny"], bounds["maxx"], bounds["maxy"]
+    )
+    return gdf
+
+
+def build_store(files, store_dir=STORE_DIR):
+    """
+    Compile `files` into a GeoParquet store and return its path.
+    Stores built from older versions of the files are removed.
+    """
+    distinct = _distinct_files(files)
+    fingerprint = _fingerprint(distinct)
+    path = store_path(fingerprint, store_dir)
+
+    gdf = compile_boundaries(distinct)
+    os.makedirs(store_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    gdf.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+    for old in glob.glob(os.path.join(store_dir, "boundaries-*.parquet")):
+        if old != path:
+            os.remove(old)
+    return path
+
+
+def load_boundaries(files, store_dir=STORE_DIR):
+    """
+    Combined GeoDataFrame of all boundary files.
+    Served from memory, then from the GeoParquet store; the store is built
+    on first use and rebuilt when any file's contents change. Byte-identical
+    files are included once. The result is shared between reruns and
+    sessions, so callers must not modify it.
+    """
+    with _lock:
+        distinct = _distinct_files(files)
+        fingerprint = _fingerprint(distinct)
+        if fingerprint in _loaded:
+            return _loaded[fingerprint]
+
+        path = store_path(fingerprint, store_dir)
+        if not os.path.exists(path):
+            build_store(files, store_dir)
+        gdf = gpd.read_parquet(path)
+
+        _loaded.clear()
+        _indexes.clear()
+        _centroids.clear()
+        _codes.clear()
+        _ward_points.clear()
+        _loaded[fingerprint] = gdf
+        return gdf
+
+
+def _mapping_key(region_map):
+    return tuple(sorted((k, tuple(v)) for k, v in region_map.items()))
+
+
+def area_index(gdf, region_map):
+    """
+    {name: row positions} for every ward name (WD13NM) and every region in
+    `region_map`, where a region expands to the rows of its wards.
+    A region name shadows a ward with the same name, as in the map filter.
+    """
+    key = (id(gdf), _mapping_key(region_map))
+    with _lock:
+        if key not in _indexes:
+            if "WD13NM" in gdf.columns:
+                index = dict(gdf.groupby("WD13NM", sort=False).indices)
+            else:
+                index = {}
+
+            empty = np.array([], dtype=np.intp)
+            for region, wards in region_map.items():
+                rows = [index[w] for w in wards if w in index]
+                index[region] = np.unique(np.concatenate(rows)) if rows else empty
+
+            _indexes[key] = index
+        return _indexes[key]
+
+
+def select_areas(gdf, regions, region_map):
+    """
+    Sorted row positions of the areas covering `regions`
+    """
+    index = area_index(gdf, region_map)
+    rows = [index[r] for r in regions if r in index]
+    if not rows:
+        return np.array([], dtype=np.intp)
+    return np.unique(np.concatenate(rows))
+
+
+def area_codes(gdf, table, column, region_map):
+    """
+    Area code of every row of `table` (an Arrow table), from its `column`
+    value: -1 when the value names no area, otherwise a zone number.
+    Also returns the spread of each zone over the rows of `gdf` as
+    (zone, row position, share) arrays, a zone covering n wards giving
+    each of them 1/n.
+    Cached on the table's b"content_sha1" schema metadata (the table
+    itself is not held) for the last CODES_CACHE_ENTRIES uploads; tables
+    without it are computed every call.
+    """
+    digest = (table.schema.metadata or {}).get(b"content_sha1")
+    key = (digest, column, id(gdf), _mapping_key(region_map))
+    with _lock:
+        cached = _codes.get(key) if digest is not None else None
+        if cached is not None:
+            _codes.move_to_end(key)
+            return cached
+
+    values = table.column(column).to_numpy(zero_copy_only=False)
+    codes, names = pd.factorize(values)
+
+    index = area_index(gdf, region_map)
+    positions = [index.get(name, np.array([], dtype=np.intp)) for name in names]
+    sizes = np.fromiter((len(p) for p in positions), dtype=np.intp, count=len(positions))
+    # Values matching no area map to -1, as do missing values (code -1 picks the last entry)
+    lookup = np.append(np.where(sizes > 0, np.arange(len(names)), -1), -1).astype(np.int32)
+    codes = lookup[codes]
+
+    zone = np.repeat(np.arange(len(names)), sizes)
+    rows = np.concatenate(positions) if positions else np.array([], dtype=np.intp)
+    share = 1.0 / np.repeat(np.maximum(sizes, 1), sizes)
+    spread = (zone, rows, share)
+
+    if digest is not None:
+        with _lock:
+            _codes[key] = (codes, spread)
+            while len(_codes) > CODES_CACHE_ENTRIES:
+                _codes.popitem(last=False)
+    return codes, spread
+
+
+def area_totals(gdf, codes, spread, row_ids, weights=None):
+    """
+    Per-row totals for `gdf` (one value per row) of `weights` over the
+    table rows `row_ids`, or of the row count when `weights` is None:
+    a bincount per zone, then each zone shared evenly over its wards.
+    """
+    selected = codes[np.asarray(row_ids, dtype=np.intp)]
+    matched = selected >= 0
+    if weights is not None:
+        weights = np.nan_to_num(np.asarray(weights, dtype=np.float64)[matched])
+    zone, rows, share = spread
+    n_zones = int(zone.max()) + 1 if len(zone) else 0
+    per_zone = np.bincount(selected[matched], weights=weights, minlength=n_zones)
+    return np.bincount(rows, weights=per_zone[zone] * share, minlength=len(gdf))
+
+
+def fit_view(gdf, positions, width=800, height=500, max_zoom=13):
+    """
+    (latitude, longitude, zoom) of a Web Mercator view of width x height
+    pixels that fits the bounding box of rows `positions`, from the
+    stored per-row bounds
+    """
+    rows = gdf.iloc[np.asarray(positions, dtype=np.intp)]
+    minx, maxx = rows["minx"].min(), rows["maxx"].max()
+    miny, maxy = rows["miny"].min(), rows["maxy"].max()
+
+    def mercator_y(lat):
+        return np.log(np.tan(np.pi / 4 + np.radians(lat) / 2))
+
+    zoom_x = np.log2(width * 360 / (256 * max(maxx - minx, 1e-9)))
+    zoom_y = np.log2(height * 2 * np.pi / (256 * max(mercator_y(maxy) - mercator_y(miny), 1e-9)))
+    zoom = float(np.clip(min(zoom_x, zoom_y), 0, max_zoom))
+
+    center_y = (mercator_y(miny) + mercator_y(maxy)) / 2
+    latitude = float(np.degrees(2 * np.arctan(np.exp(center_y)) - np.pi / 2))
+    return latitude, float((minx + maxx) / 2), zoom
+
+
+def choose_tolerance(zoom, n_areas):
+    """
+    Pyramid level for a map view: the coarsest tolerance that is still
+    below one screen pixel at `zoom`, one level coarser again for busy
+    views (many areas) where fine detail is lost anyway.
+    """
+    pixel = 360 / (256 * 2 ** zoom)  # degrees per pixel at the equator
+    level = 0
+    for i, tolerance in enumerate(SIMPLIFY_LEVELS):
+        if tolerance <= pixel:
+            level = i
+
+    if n_areas > 60:
+        level += 2
+    elif n_areas > 20:
+        level += 1
+    return SIMPLIFY_LEVELS[min(level, len(SIMPLIFY_LEVELS) - 1)]
+
+
+def simplified_geometry(gdf, positions, tolerance):
+    """
+    Pre-simplified geometry of the given rows (falls back to simplifying
+    on the fly for a tolerance that is not in the store)
+    """
+    column = lod_column(tolerance)
+    if column in gdf.columns:
+        return gdf[column].take(positions)
+    return gdf.geometry.take(positions).simplify(tolerance=tolerance)
+
+
+def area_centroid(gdf, positions, tolerance=0.01):
+    """
+    Centroid of the simplified areas' centroids, memoised per set of rows
+    """
+    key = (id(gdf), np.asarray(positions).tobytes(), tolerance)
+    with _lock:
+        if key not in _centroids:
+            simplified = simplified_geometry(gdf, positions, tolerance)
+            _centroids[key] = simplified.centroid.union_all().centroid
+        return _centroids[key]
+
+
+def ward_centroids(gdf, tolerance=0.01):
+    """
+    {ward name (WD13NM): {"lat", "lon"}} of every ward in `gdf`, one point
+    per name from the centroid of its simplified area (built once per frame)
+    """
+    with _lock:
+        cached = _ward_points.get(id(gdf))
+    if cached is not None:
+        return cached[1]
+
+    points = {}
+    if "WD13NM" in gdf.columns:
+        wards = gdf["WD13NM"].notna().to_numpy()
+        positions = np.flatnonzero(wards)
+        shapes = simplified_geometry(gdf, positions, tolerance)
+        by_name = shapes.groupby(gdf["WD13NM"].iloc[positions].to_numpy(), sort=True)
+        for name, group in by_name:
+            centre = shapely.centroid(shapely.union_all(group.to_numpy()))
+            points[name] = {"lat": centre.y, "lon": centre.x}
+
+    with _lock:
+        _ward_points[id(gdf)] = (gdf, points)
+    return points
+
+
+def compact_polygons(geoms, scale=1e-4, properties=None):
+    """
+    Compact payload for a pydeck PolygonLayer.
+
+    Coordinates are quantised to integer steps of `scale` degrees (1e-4 ≈ 10m,
+    finer than any pyramid level) as offsets from the south-west corner of
+    the selection; repeated points left after quantising are dropped.
+    Returns the rows ({"polygon": rings}, plus the `properties` dict of the
+    geometry each polygon came from) with the coordinate origin and the
+    model matrix that scales the integers back to degrees in deck.gl.
+    """
+    parts, geom_of_part = shapely.get_parts(np.asarray(geoms), return_index=True)
+    present = ~shapely.is_empty(parts)
+    parts, geom_of_part = parts[present], geom_of_part[present]
+    if len(parts) == 0:
+        return {"data": [], "origin": [0.0, 0.0], "model_matrix": None}
+
+    rings, part_of_ring = shapely.get_rings(parts, return_index=True)
+    coords, ring_of_point = shapely.get_coordinates(rings, return_index=True)
+
+    origin = coords.min(axis=0)
+    q = np.rint((coords - origin) / scale).astype(np.int64)
+
+    # Keep a point when it starts a ring or differs from the previous one
+    keep = np.ones(len(q), dtype=bool)
+    keep[1:] = (ring_of_point[1:] != ring_of_point[:-1]) | np.any(q[1:] != q[:-1], axis=1)
+    q, ring_of_point = q[keep], ring_of_point[keep]
+
+    counts = np.bincount(ring_of_point, minlength=len(rings))
+    points = q.tolist()
+    offsets = np.concatenate([[0], np.cumsum(counts)]).tolist()
+
+    data, current, polygon = [], -1, None
+    for ring_no, part_no in enumerate(part_of_ring.tolist()):
+        ring = points[offsets[ring_no]:offsets[ring_no + 1]]
+        if part_no != current:
+            current = part_no
+            # First ring of a part is its exterior; a collapsed exterior drops the part
+            polygon = [ring] if len(ring) >= 4 else None
+            if polygon is not None:
+                row = {"polygon": polygon}
+                if properties is not None:
+                    row.update(properties[geom_of_part[part_no]])
+                data.append(row)
+        elif polygon is not None and len(ring) >= 4:
+            polygon.append(ring)
+
+    model_matrix = [
+        scale, 0, 0, 0,
+        0, scale, 0, 0,
+        0, 0, 1, 0,
+        0, 0, 0, 1,
+    ]
+    return {"data": data, "origin": origin.tolist(), "model_matrix": model_matrix}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile Maps/ into the boundary store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build the GeoParquet boundary store")
+    build.add_argument("--maps", default=MAPS_DIR, help="folder with the TopoJSON files")
+    build.add_argument("--out", default=STORE_DIR, help="folder for the store")
+    bench = sub.add_parser("bench", help="time read_topojson against gpd.read_file")
+    bench.add_argument("--maps", default=MAPS_DIR, help="folder with the TopoJSON files")
+    bench.add_argument("--repeat", type=int, default=5, help="runs per file (best is kept)")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        files = boundary_files(args.maps)
+        start = time.perf_counter()
+        path = build_store(files, args.out)
+        print(f"Built {path} from {len(files)} files in {time.perf_counter() - start:.2f}s")
+
+    elif args.command == "bench":
+        def best(read, path):
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                read(path)
+                times.append(time.perf_counter() - start)
+            return min(times) * 1000
+
+        totals = [0.0, 0.0]
+        print(f"{'file':<40} {'read_file ms':>12} {'topojson ms':>12} {'speed-up':>9}")
+        for path in _distinct_files(boundary_files(args.maps)).values():
+            gdal, native = best(gpd.read_file, path), best(read_topojson, path)
+            totals[0] += gdal
+            totals[1] += native
+            print(f"{os.path.basename(path):<40} {gdal:>12.1f} {native:>12.1f} {gdal / native:>8.1f}x")
+        print(f"{'total':<40} {totals[0]:>12.1f} {totals[1]:>12.1f} {totals[0] / totals[1]:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# figure_cache.py
+"""
+Built Plotly figures, shared by reruns and sessions.
+
+Figures are kept per (kind, key), where the key identifies the dataset
+and filter state a chart was drawn from (see `selection_key` in the
+dashboard). An unchanged chart is handed straight back to
+`st.plotly_chart` instead of being aggregated and rebuilt through
+plotly express on every rerun. Hits and misses are counted per kind;
+a figure's JSON size is only measured when the statistics are read, so
+drawing a chart never serialises it twice.
+"""
+
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+MAX_FIGURES = 256  # least recently used figures are dropped past this
+
+_lock = threading.Lock()
+_figures = OrderedDict()  # (kind, key) -> [figure, JSON size in bytes or None until measured]
+_stats = {}               # kind -> {"hits", "misses"}
+
+
+def cached_figure(kind, key, build):
+    """
+    Figure for (kind, key); `build()` is only called on a miss
+    """
+    entry_key = (kind, key)
+    with _lock:
+        counts = _stats.setdefault(kind, {"hits": 0, "misses": 0})
+        entry = _figures.get(entry_key)
+        if entry is not None:
+            _figures.move_to_end(entry_key)
+            counts["hits"] += 1
+            return entry[0]
+
+    fig = build()
+
+    with _lock:
+        counts["misses"] += 1
+        _figures[entry_key] = [fig, None]
+        while len(_figures) > MAX_FIGURES:
+            _figures.popitem(last=False)
+    return fig
+
+
+def figure_stats():
+    """
+    Rows of kind, hits, misses, hit rate, cached figures and their
+    JSON size, most used kinds first. Figures not measured yet are
+    serialised here, once each.
+    """
+    with _lock:
+        unsized = [entry for entry in _figures.values() if entry[1] is None]
+    for entry in unsized:
+        entry[1] = len(pio.to_json(entry[0], validate=False))
+
+    with _lock:
+        cached, sizes = {}, {}
+        for (kind, _), (_, size) in _figures.items():
+            cached[kind] = cached.get(kind, 0) + 1
+            sizes[kind] = sizes.get(kind, 0) + (size or 0)
+        rows = [
+            {
+                "kind": kind,
+                "hits": c["hits"],
+                "misses": c["misses"],
+                "hit rate": c["hits"] / max(c["hits"] + c["misses"], 1),
+                "cached": cached.get(kind, 0),
+                "json bytes": sizes.get(kind, 0),
+            }
+            for kind, c in _stats.items()
+        ]
+    return sorted(rows, key=lambda r: r["hits"] + r["misses"], reverse=True)
+
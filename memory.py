@@ -0,0 +1,255 @@
+# memory.py
+"""
+Memory accounting for the dashboard.
+
+Each session reports the frames it holds with `report_frame`. A frame is
+measured once (deep size, geometry included) and kept only through a
+weak reference, so the diagnostics panel shows what is still alive:
+per session, and process-wide across sessions, where frames shared
+through the upload caches are counted once.
+
+Cache layers are sized from Streamlit's own statistics (the numbers
+behind /_stcore/metrics: st.cache_data, st.cache_resource, uploaded
+files, media files, session state) where its internals allow. `track_peak` samples the process
+RSS while an export is built.
+"""
+
+import os
+import sys
+import threading
+import weakref
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PEAK_SAMPLE_SECONDS = 0.005  # RSS polling interval while an export runs
+
+_lock = threading.Lock()
+_sizes = {}     # id(frame) -> (weak reference, rows, bytes)
+_sessions = {}  # session key -> {frame name: id(frame)}
+_exports = {}   # export name -> {"runs", "last peak", "max peak", "max growth"}
+
+
+# -------------------------------
+# --- Process ---
+# -------------------------------
+def peak_rss_bytes():
+    """
+    Highest resident set size of the process so far, in bytes (0 where unknown)
+    """
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def rss_bytes():
+    """
+    Current resident set size of the process, in bytes; falls back to the
+    peak where /proc is not available
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_bytes()
+
+
+# -------------------------------
+# --- Frames ---
+# -------------------------------
+def frame_bytes(frame):
+    """
+    Deep size of a DataFrame, GeoDataFrame or Arrow table in bytes.
+    Geometry columns are counted by their coordinates (16 bytes each),
+    which pandas does not see behind the geometry objects.
+    """
+    if not hasattr(frame, "memory_usage"):
+        return int(frame.nbytes)
+
+    size = int(frame.memory_usage(index=True, deep=True).sum())
+    for i, dtype in enumerate(frame.dtypes):
+        if getattr(dtype, "name", "") == "geometry":
+            import shapely
+            size += int(shapely.get_num_coordinates(np.asarray(frame.iloc[:, i])).sum()) * 16
+    return size
+
+
+def report_frame(session, name, frame):
+    """
+    Record that `session` holds `frame` under `name` (None forgets it).
+    Frames already measured are not measured again.
+    """
+    if frame is None:
+        with _lock:
+            _sessions.get(session, {}).pop(name, None)
+        return
+
+    key = id(frame)
+    with _lock:
+        entry = _sizes.get(key)
+        measured = entry is not None and entry[0]() is frame
+    if not measured:
+        entry = (weakref.ref(frame), len(frame), frame_bytes(frame))
+
+    with _lock:
+        _sizes[key] = entry
+        _sessions.setdefault(session, {})[name] = key
+
+
+def _live(key):
+    """
+    (rows, bytes) of a reported frame that is still alive, else None
+    """
+    entry = _sizes.get(key)
+    if entry is None or entry[0]() is None:
+        return None
+    return entry[1], entry[2]
+
+
+def session_frames(session):
+    """
+    Rows of frame, rows, bytes and whether it is still alive, for the
+    frames `session` reported
+    """
+    with _lock:
+        rows = []
+        for name, key in _sessions.get(session, {}).items():
+            live = _live(key)
+            rows.append({
+                "frame": name,
+                "rows": live[0] if live else None,
+                "bytes": live[1] if live else None,
+                "live": live is not None,
+            })
+    return rows
+
+
+def process_totals():
+    """
+    {"sessions", "frames", "frame bytes", "rss", "peak rss"}: sessions
+    holding live frames, distinct live frames across them and their size,
+    and the process RSS now and at its peak. Dead entries are dropped.
+    """
+    with _lock:
+        for key in [k for k, (ref, _, _) in _sizes.items() if ref() is None]:
+            del _sizes[key]
+        live_keys = set()
+        for session in list(_sessions):
+            keys = {k for k in _sessions[session].values() if k in _sizes}
+            if not keys:
+                del _sessions[session]
+            live_keys |= keys
+        frame_total = sum(_sizes[k][2] for k in live_keys)
+        sessions = len(_sessions)
+
+    return {
+        "sessions": sessions,
+        "frames": len(live_keys),
+        "frame bytes": frame_total,
+        "rss": rss_bytes(),
+        "peak rss": peak_rss_bytes(),
+    }
+
+
+# -------------------------------
+# --- Caches ---
+# -------------------------------
+def streamlit_cache_sizes():
+    """
+    Rows of layer, cache and bytes from Streamlit's statistics.
+    st.cache_resource entries are only sized when the server runs with
+    server.enableExpensiveMemoryStats; otherwise Streamlit reports an
+    entry count, which is returned as "entries" with no bytes.
+    These statistics are Streamlit internals (written against 1.66, as
+    pinned in requirements.txt); if they move, no rows are returned and
+    the panel falls back to RSS and the reported frames.
+    """
+    try:
+        return _streamlit_cache_sizes()
+    except Exception:
+        return []
+
+
+def _streamlit_cache_sizes():
+    from streamlit import config, runtime
+    from streamlit.runtime.caching import (
+        get_data_cache_stats_provider, get_resource_cache_stats_provider
+    )
+    from streamlit.runtime.stats import CACHE_MEMORY_FAMILY
+
+    stats = []
+    for provider in (get_data_cache_stats_provider(), get_resource_cache_stats_provider()):
+        stats += provider.get_stats([CACHE_MEMORY_FAMILY]).get(CACHE_MEMORY_FAMILY, [])
+    if runtime.exists():
+        # Uploaded files, media files and session state; the function caches come from above
+        for stat in runtime.get_instance().stats_mgr.get_stats([CACHE_MEMORY_FAMILY]).get(CACHE_MEMORY_FAMILY, []):
+            if not stat.category_name.startswith("st_cache_"):
+                stats.append(stat)
+
+    sized_resources = config.get_option("server.enableExpensiveMemoryStats")
+    totals = {}
+    for stat in stats:
+        key = (stat.category_name, stat.cache_name)
+        totals[key] = totals.get(key, 0) + stat.byte_length
+
+    rows = []
+    for (layer, cache), total in sorted(totals.items()):
+        counted = layer == "st_cache_resource" and not sized_resources
+        rows.append({
+            "layer": layer,
+            "cache": cache.rsplit(".", 1)[-1],
+            "entries": total if counted else None,
+            "bytes": None if counted else total,
+        })
+    return rows
+
+
+# -------------------------------
+# --- Exports ---
+# -------------------------------
+@contextmanager
+def track_peak(name):
+    """
+    Sample the process RSS while the block (or each decorated call) runs
+    and record the peak, and its growth over the starting RSS, for export
+    `name`. Exports running at the same time share the process, so their
+    peaks include each other.
+    """
+    start = rss_bytes()
+    peak = [start]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(PEAK_SAMPLE_SECONDS):
+            peak[0] = max(peak[0], rss_bytes())
+
+    sampler = threading.Thread(target=sample, name="rss-sampler", daemon=True)
+    sampler.start()
+    try:
+        yield
+    finally:
+        done.set()
+        sampler.join()
+        top = max(peak[0], rss_bytes())
+        with _lock:
+            stats = _exports.setdefault(name, {"runs": 0, "last peak": 0, "max peak": 0, "max growth": 0})
+            stats["runs"] += 1
+            stats["last peak"] = top
+            stats["max peak"] = max(stats["max peak"], top)
+            stats["max growth"] = max(stats["max growth"], top - start)
+
+
+def export_peaks():
+    """
+    Rows of export, runs, last and max peak RSS and the largest growth
+    over the RSS the export started at, in bytes; largest peak first
+    """
+    with _lock:
+        rows = [{"export": name, **stats} for name, stats in _exports.items()]
+    return sorted(rows, key=lambda r: r["max peak"], reverse=True)
@@ -0,0 +1,193 @@
+# perf.py
+"""
+Timing for the dashboard.
+
+The app records how long each script run takes to reach its first paint
+(KPI header and revenue chart); the first run in a process is the cold
+start, which includes the dashboard's own imports.
+
+Steps of a run (ingestion, filters, KPIs, charts, sections, exports)
+are timed with `timed` into a per-session log, which `timing_summary`
+turns into p50/p95 rows for the sidebar Performance panel.
+
+`python perf.py imports` reports, in fresh interpreters, what each
+dependency adds on top of Streamlit and pandas, and what the
+dashboard's top-level imports cost before anything is drawn.
+"""
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Gaeltec.py")
+BASELINE = ("streamlit", "pandas")  # loaded before the script runs at all
+DEPENDENCIES = (
+    "numpy", "pyarrow", "pyarrow.parquet", "PIL.Image", "plotly.graph_objects",
+    "plotly.express", "openpyxl", "docx", "pydeck", "geopandas", "shapely", "requests",
+)
+
+SAMPLES_PER_STEP = 200  # most recent timings kept per step for the percentiles
+
+_lock = threading.Lock()
+_first_paint = {"imports": None, "cold": None, "last": None, "runs": 0}
+
+
+# -------------------------------
+# --- First paint ---
+# -------------------------------
+def record_imports(started):
+    """
+    Store how long the script's top-level imports took; only the first
+    run in the process pays for them, so later calls are ignored
+    """
+    elapsed = time.perf_counter() - started
+    with _lock:
+        if _first_paint["imports"] is None:
+            _first_paint["imports"] = elapsed
+    return elapsed
+
+
+def record_first_paint(started):
+    """
+    Store the time from `started` (perf_counter at the top of the script)
+    to the first paint; the first call in the process is the cold start
+    """
+    elapsed = time.perf_counter() - started
+    with _lock:
+        if _first_paint["cold"] is None:
+            _first_paint["cold"] = elapsed
+        _first_paint["last"] = elapsed
+        _first_paint["runs"] += 1
+    return elapsed
+
+
+def first_paint_times():
+    """
+    {"imports", "cold", "last", "runs"}: cold-start import time, cold
+    start and latest run to first paint in seconds (None until
+    recorded), and how many runs were recorded
+    """
+    with _lock:
+        return dict(_first_paint)
+
+
+# -------------------------------
+# --- Step timings ---
+# -------------------------------
+def record(log, name, seconds):
+    """
+    Add one timing of step `name` to `log`, a dict of bounded deques
+    """
+    samples = log.get(name)
+    if samples is None:
+        samples = log.setdefault(name, deque(maxlen=SAMPLES_PER_STEP))
+    samples.append(seconds)
+
+
+@contextmanager
+def timed(log, name):
+    """
+    Time the block, or each call when used as a decorator, into `log[name]`
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(log, name, time.perf_counter() - started)
+
+
+def timed_loop(log, items, name):
+    """
+    Yield `items`, timing the loop body for each one into `log[name(item)]`
+    """
+    for item in items:
+        started = time.perf_counter()
+        try:
+            yield item
+        finally:
+            record(log, name(item), time.perf_counter() - started)
+
+
+def timing_summary(log):
+    """
+    Rows of step, runs, last, p50 and p95 (milliseconds) over the kept
+    timings of each step, slowest p95 first
+    """
+    rows = []
+    for name, samples in list(log.items()):
+        values = np.array(list(samples)) * 1000
+        if not len(values):
+            continue
+        p50, p95 = np.percentile(values, [50, 95])
+        rows.append({"step": name, "runs": len(values), "last ms": values[-1], "p50 ms": p50, "p95 ms": p95})
+    return sorted(rows, key=lambda r: r["p95 ms"], reverse=True)
+
+
+# -------------------------------
+# --- Import report ---
+# -------------------------------
+def _timed_import(statements, baseline=BASELINE):
+    """
+    Seconds taken by `statements` in a fresh interpreter, after the
+    baseline modules are already imported
+    """
+    code = (
+        "".join(f"import {m}\n" for m in baseline)
+        + "import time\n_t = time.perf_counter()\n"
+        + statements
+        + "\nprint(time.perf_counter() - _t)\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True,
+        cwd=os.path.dirname(APP_PATH), check=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def app_imports(path=APP_PATH):
+    """
+    The script's top-level import statements, as source
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(
+        ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def import_report(modules=DEPENDENCIES, repeat=3):
+    """
+    [(name, seconds)] for each dependency and for the dashboard's
+    top-level imports; best of `repeat` fresh interpreters each
+    """
+    def best(statements):
+        return min(_timed_import(statements) for _ in range(repeat))
+
+    rows = [(m, best(f"import {m}")) for m in modules]
+    rows.append(("Gaeltec.py top-level imports", best(app_imports())))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dashboard startup timing")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imports = sub.add_parser("imports", help="time each dependency import in a fresh interpreter")
+    imports.add_argument("--repeat", type=int, default=3, help="interpreters per module (best is kept)")
+    args = parser.parse_args(argv)
+
+    if args.command == "imports":
+        print(f"{'import (after ' + ' + '.join(BASELINE) + ')':<40} {'ms':>8}")
+        for name, seconds in import_report(repeat=args.repeat):
+            print(f"{name:<40} {seconds * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
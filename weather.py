@@ -0,0 +1,534 @@
+# weather.py
+"""
+OpenWeatherMap client for the Weather panel.
+
+Requests go through one pooled requests.Session with strict timeouts.
+Responses are cached per location with a TTL and served
+stale-while-revalidate: a stale or missing entry is refreshed on a
+background thread and the caller gets whatever is cached right now, so
+the page never waits on the network. Forecasts for every location are
+fetched together, concurrently, into one tidy DataFrame, one request
+per FORECAST_GRID cell. A 429 is not retried straight away: the entry
+backs off for as long as the API's Retry-After asks.
+
+For offline testing run the local stub and point the client at it:
+
+    python weather.py stub --port 8765
+    WEATHER_API_URL=http://127.0.0.1:8765 streamlit run Gaeltec.py
+"""
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_URL = os.environ.get("WEATHER_API_URL", "http://api.openweathermap.org/data/2.5")
+TIMEOUT = (3.05, 5)    # (connect, read) seconds
+CURRENT_TTL = 10 * 60  # seconds a current-weather reading is fresh
+FORECAST_TTL = 30 * 60 # seconds a batch of forecasts is fresh
+RETRY_AFTER = 60       # seconds before a failed fetch is tried again (429s use Retry-After)
+FETCH_WORKERS = 4      # concurrent requests in a forecast batch
+FORECAST_GRID = 0.1    # degrees; forecast points in the same cell share one request
+
+# Coordinates for Scottish locations
+LOCATIONS = {
+    "Ayrshire": {"lat": 55.458, "lon": -4.629},
+    "Lanarkshire": {"lat": 55.676, "lon": -3.785},
+    "Glasgow": {"lat": 55.864, "lon": -4.252},
+    "Edinburgh": {"lat": 55.953, "lon": -3.188}
+}
+
+_lock = threading.Lock()
+_entries = {}  # key -> {"data", "fetched", "error", "failed", "retry_after"}
+_pending = {}  # key -> Future of the refresh in flight
+
+
+@lru_cache(maxsize=1)
+def session() -> requests.Session:
+    """
+    Pooled HTTP session shared by every page and refresh thread.
+    Retries once on connection errors and 5xx responses. A 429 is left
+    to fetch(), which raises RateLimited, rather than retried or slept on
+    here (urllib3 would otherwise sleep out any Retry-After in a worker).
+    """
+    retry = Retry(
+        total=1, backoff_factor=0.5, respect_retry_after_header=False,
+        status_forcelist=(500, 502, 503, 504), allowed_methods=("GET",)
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=16, max_retries=retry)
+    s = requests.Session()
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+@lru_cache(maxsize=1)
+def _refresh_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="weather")
+
+
+@lru_cache(maxsize=1)
+def _fetch_pool() -> ThreadPoolExecutor:
+    # Separate from the refresh pool: a batch refresh waits on these
+    return ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="weather-fetch")
+
+
+class RateLimited(requests.HTTPError):
+    """
+    A 429 from the API; `retry_after` is how many seconds it asked us to wait
+    """
+    def __init__(self, retry_after, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.retry_after = retry_after
+
+
+def retry_after_seconds(response, default=RETRY_AFTER):
+    """
+    Seconds from a Retry-After header (delay or HTTP date), else `default`
+    """
+    value = response.headers.get("Retry-After", "").strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+def fetch(endpoint, coords, api_key):
+    """
+    GET {API_URL}/{endpoint} for a lat/lon in metric units.
+    Raises RateLimited on a 429.
+    """
+    params = {"lat": coords["lat"], "lon": coords["lon"], "appid": api_key, "units": "metric"}
+    response = session().get(f"{API_URL}/{endpoint}", params=params, timeout=TIMEOUT)
+    if response.status_code == 429:
+        wait = retry_after_seconds(response)
+        raise RateLimited(wait, f"429 rate limited by {endpoint}, retry after {wait:.0f}s", response=response)
+    response.raise_for_status()
+    return response.json()
+
+
+def _refresh(key, load):
+    try:
+        data = load()
+    except Exception as e:
+        with _lock:
+            entry = _entries.setdefault(
+                key, {"data": None, "fetched": None, "error": None, "failed": None, "retry_after": None}
+            )
+            entry["error"], entry["failed"] = str(e), time.time()
+            entry["retry_after"] = getattr(e, "retry_after", RETRY_AFTER)
+    else:
+        with _lock:
+            _entries[key] = {"data": data, "fetched": time.time(), "error": None, "failed": None, "retry_after": None}
+    finally:
+        with _lock:
+            _pending.pop(key, None)
+
+
+def _schedule(key, load):
+    """
+    Start a background refresh of `key` unless one is already running.
+    Call with _lock held.
+    """
+    if key not in _pending:
+        _pending[key] = _refresh_pool().submit(_refresh, key, load)
+    return _pending[key]
+
+
+def cached(key, load, ttl):
+    """
+    Stale-while-revalidate lookup. Returns the cached entry for `key`
+    ({"data", "fetched", "error", "failed", "retry_after", "refreshing"})
+    without blocking; when it is missing or older than `ttl` seconds,
+    `load()` runs in the background and a later call sees the new data.
+    After a failed fetch the stale entry is served for `retry_after`
+    seconds (the API's Retry-After on a 429, else RETRY_AFTER) before
+    trying again.
+    """
+    with _lock:
+        entry = dict(_entries.get(key) or {
+            "data": None, "fetched": None, "error": None, "failed": None, "retry_after": None
+        })
+        now = time.time()
+        stale = entry["fetched"] is None or now - entry["fetched"] > ttl
+        backing_off = entry["failed"] is not None and now - entry["failed"] < (entry["retry_after"] or RETRY_AFTER)
+        if stale and not backing_off:
+            _schedule(key, load)
+        entry["refreshing"] = key in _pending
+    return entry
+
+
+def refresh(key, load):
+    """
+    Refresh `key` in the background now, regardless of its age
+    """
+    with _lock:
+        return _schedule(key, load)
+
+
+def _current_key(location, coords):
+    if coords is None:
+        location = location if location in LOCATIONS else "Ayrshire"
+        coords = LOCATIONS[location]
+    return ("weather", location, coords["lat"], coords["lon"]), coords
+
+
+def current_weather(api_key, location="Ayrshire", coords=None):
+    """
+    Cached current weather for a location. Without `coords` the name is
+    looked up in LOCATIONS (unknown names fall back to Ayrshire).
+    See cached() for the entry layout.
+    """
+    key, coords = _current_key(location, coords)
+    return cached(key, lambda: fetch("weather", coords, api_key), CURRENT_TTL)
+
+
+def refresh_current_weather(api_key, location="Ayrshire", coords=None):
+    key, coords = _current_key(location, coords)
+    return refresh(key, lambda: fetch("weather", coords, api_key))
+
+
+# ---------------- 5-day forecast ----------------
+FORECAST_COLUMNS = [
+    "location", "lat", "lon", "time", "temp", "feels_like", "humidity",
+    "wind_speed", "wind_gust", "rain_3h", "snow_3h", "pop", "description", "icon"
+]
+
+
+def forecast_rows(location, coords, payload):
+    """
+    One row per 3-hour step of an OpenWeatherMap /forecast response
+    """
+    rows = []
+    for step in payload.get("list", []):
+        main, wind = step.get("main", {}), step.get("wind", {})
+        weather = (step.get("weather") or [{}])[0]
+        rows.append((
+            location, coords["lat"], coords["lon"], step.get("dt"),
+            main.get("temp"), main.get("feels_like"), main.get("humidity"),
+            wind.get("speed"), wind.get("gust"),
+            (step.get("rain") or {}).get("3h", 0.0), (step.get("snow") or {}).get("3h", 0.0),
+            step.get("pop"), weather.get("description"), weather.get("icon"),
+        ))
+    return rows
+
+
+def grid_cell(coords, grid=FORECAST_GRID):
+    """
+    {"lat", "lon"} of the centre of the `grid`-degree cell holding `coords`
+    """
+    return {"lat": round(round(coords["lat"] / grid) * grid, 4), "lon": round(round(coords["lon"] / grid) * grid, 4)}
+
+
+def fetch_forecasts(api_key, points):
+    """
+    5-day / 3-hour forecast for every {name: {"lat", "lon"}} in `points`,
+    fetched concurrently, as a tidy DataFrame (one row per location and
+    step; `time` is local Scottish time). Points in the same FORECAST_GRID
+    cell share one request. After a 429 the requests not yet sent are
+    dropped. Locations that fail are listed in df.attrs["failed"]; if
+    every location fails the error is raised (a RateLimited one first).
+    """
+    names = list(points)
+    cells = {name: grid_cell(points[name]) for name in names}
+    limited = {}  # the first RateLimited of the batch, once there is one
+
+    def fetch_cell(coords):
+        if "error" in limited:
+            raise limited["error"]
+        try:
+            return fetch("forecast", coords, api_key)
+        except RateLimited as e:
+            limited.setdefault("error", e)
+            raise
+
+    futures = {}
+    for name in names:
+        cell = (cells[name]["lat"], cells[name]["lon"])
+        if cell not in futures:
+            futures[cell] = _fetch_pool().submit(fetch_cell, cells[name])
+
+    payloads = {}
+    for cell, future in futures.items():
+        try:
+            payloads[cell] = future.result()
+        except Exception as e:
+            payloads[cell] = e
+    rate_limited = limited.get("error")
+
+    rows, failed, first_error = [], {}, None
+    for name in names:
+        payload = payloads[(cells[name]["lat"], cells[name]["lon"])]
+        if isinstance(payload, Exception):
+            failed[name] = str(payload)
+            first_error = first_error or payload
+        else:
+            rows.extend(forecast_rows(name, points[name], payload))
+    if names and len(failed) == len(names):
+        raise rate_limited or first_error
+
+    df = pd.DataFrame.from_records(rows, columns=FORECAST_COLUMNS)
+    df["time"] = (
+        pd.to_datetime(df["time"], unit="s", utc=True)
+        .dt.tz_convert("Europe/London").dt.tz_localize(None)
+    )
+    for col in ["temp", "feels_like", "humidity", "wind_speed", "wind_gust", "rain_3h", "snow_3h", "pop"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df.attrs["failed"] = failed
+    return df
+
+
+def forecast_points(extra=None):
+    """
+    LOCATIONS plus `extra` ({name: {"lat", "lon"}}, e.g. ward centroids),
+    with coordinates rounded to the 0.01° the API resolves
+    """
+    points = dict(LOCATIONS)
+    points.update(extra or {})
+    return {n: {"lat": round(c["lat"], 2), "lon": round(c["lon"], 2)} for n, c in points.items()}
+
+
+def forecasts(api_key, points):
+    """
+    Cached tidy forecast for all `points` (see fetch_forecasts), refreshed
+    as one batch every FORECAST_TTL seconds. Same entry layout as cached();
+    "data" is the DataFrame.
+    """
+    key = ("forecast", tuple(sorted((n, c["lat"], c["lon"]) for n, c in points.items())))
+    return cached(key, lambda: fetch_forecasts(api_key, points), FORECAST_TTL)
+
+
+# ---------------- Construction risk ----------------
+# Risk levels: 0 ok, 1 caution, 2 stop. Thresholds are (caution, stop).
+WIND_LIMITS = (10.0, 15.0)    # mean wind, m/s (overhead line work at height)
+GUST_LIMITS = (15.0, 20.0)    # gusts, m/s
+RAIN_LIMITS = (2.0, 7.5)      # mm per 3 hours
+COLD_LIMITS = (0.0, -5.0)     # °C, at or below
+HEAT_LIMITS = (27.0, 32.0)    # °C, at or above
+WORK_HOURS = (7, 19)          # local hours whose forecast steps count for a working day
+RISK_LABELS = np.array(["OK", "Caution", "Stop"], dtype=object)
+
+
+def _level(values, limits, below=False):
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=-np.inf if not below else np.inf)
+    if below:
+        values, limits = -values, (-limits[0], -limits[1])
+    return (values >= limits[0]).astype(np.int8) + (values >= limits[1])
+
+
+def score_weather(df):
+    """
+    Add wind_risk, rain_risk, temp_risk and risk (the worst of the three)
+    to a frame with temp, wind_speed, wind_gust and rain_3h columns, e.g.
+    every step of the forecast frame
+    """
+    out = df.copy()
+    out["wind_risk"] = np.maximum(
+        _level(df["wind_speed"], WIND_LIMITS), _level(df["wind_gust"], GUST_LIMITS)
+    )
+    out["rain_risk"] = _level(df["rain_3h"], RAIN_LIMITS)
+    out["temp_risk"] = np.maximum(
+        _level(df["temp"], COLD_LIMITS, below=True), _level(df["temp"], HEAT_LIMITS)
+    )
+    out["risk"] = out[["wind_risk", "rain_risk", "temp_risk"]].max(axis=1)
+    return out
+
+
+def _reasons(df):
+    """
+    Human-readable causes per row of a scored frame, e.g. "wind 12 m/s, rain 4.1 mm"
+    """
+    parts = [
+        (df["wind_risk"] > 0, "wind " + df["wind_max"].fillna(0).round(0).astype(int).astype(str) + " m/s"),
+        (df["rain_risk"] > 0, "rain " + df["rain_max"].fillna(0).round(1).astype(str) + " mm/3h"),
+        (df["temp_risk"] > 0, "temp " + df["temp_extreme"].fillna(0).round(0).astype(int).astype(str) + "°C"),
+    ]
+    text = pd.Series("", index=df.index, dtype=object)
+    for flag, label in parts:
+        text = text.where(~flag, text + np.where(text == "", "", ", ") + label)
+    return text
+
+
+def daily_risk(forecast_df):
+    """
+    Worst working-hours risk per location and date from the forecast
+    frame: one row per (location, date) with the risk levels, max wind,
+    max 3-hour rain, the temperature furthest from comfortable, and reasons.
+    """
+    hours = forecast_df["time"].dt.hour
+    steps = score_weather(forecast_df[(hours >= WORK_HOURS[0]) & (hours <= WORK_HOURS[1])])
+    steps["date"] = steps["time"].dt.normalize()
+    steps["wind_max"] = steps[["wind_speed", "wind_gust"]].max(axis=1)
+    # The temperature furthest from a mild 15°C is the one worth reporting
+    steps["temp_extreme"] = steps["temp"]
+    steps["temp_distance"] = (steps["temp"] - 15).abs()
+
+    grouped = steps.groupby(["location", "date"], sort=False)
+    daily = grouped.agg(
+        risk=("risk", "max"), wind_risk=("wind_risk", "max"), rain_risk=("rain_risk", "max"),
+        temp_risk=("temp_risk", "max"), wind_max=("wind_max", "max"), rain_max=("rain_3h", "max"),
+    )
+    extreme = steps.loc[grouped["temp_distance"].idxmax(), ["location", "date", "temp_extreme"]]
+    daily = daily.join(extreme.set_index(["location", "date"])).reset_index()
+    daily["reasons"] = _reasons(daily)
+    daily["risk_label"] = RISK_LABELS[daily["risk"].to_numpy()]
+    return daily
+
+
+def region_locations(region_map, locations):
+    """
+    (region, location) pairs linking the dashboard's region values to
+    forecast locations: a location name stands for itself, and a region
+    in `region_map` covers the forecast points of its wards
+    """
+    locations = set(locations)
+    pairs = [(name, name) for name in locations]
+    pairs += [(region, ward) for region, wards in region_map.items() for ward in wards if ward in locations]
+    return pd.DataFrame(pairs, columns=["region", "location"]).drop_duplicates()
+
+
+def planned_risk(rows, daily, pairs, region_col="region", date_col="datetouse_dt"):
+    """
+    Planned rows joined to the forecast risk of their region and date, in
+    one merge. A region covering several forecast points takes its worst
+    point for the day. Rows outside the forecast get no match (NaN risk).
+    """
+    region_day = pairs.merge(daily, on="location")
+    worst = region_day.sort_values("risk", ascending=False, kind="stable").drop_duplicates(["region", "date"])
+    worst = worst.rename(columns={"region": region_col, "date": date_col})
+    return rows.merge(
+        worst[[region_col, date_col, "location", "risk", "risk_label", "reasons"]],
+        on=[region_col, date_col], how="left"
+    )
+
+
+def assess_construction_impact(weather_data):
+    """
+    One-line construction verdict for a current-weather reading
+    """
+    main, wind = weather_data.get("main", {}), weather_data.get("wind", {})
+    rain = weather_data.get("rain") or {}
+    reading = pd.DataFrame({
+        "temp": [main.get("temp")], "wind_speed": [wind.get("speed")],
+        "wind_gust": [wind.get("gust")],
+        # Current readings report rain over 1h (or 3h); scale 1h to the 3h limits
+        "rain_3h": [rain.get("3h", rain.get("1h", 0.0) * 3)],
+    })
+    scored = score_weather(reading)
+    scored["wind_max"] = scored[["wind_speed", "wind_gust"]].max(axis=1)
+    scored["rain_max"] = scored["rain_3h"]
+    scored["temp_extreme"] = scored["temp"]
+    level, reasons = int(scored["risk"].iloc[0]), _reasons(scored).iloc[0]
+    if level == 0:
+        return "✅ Good conditions for construction work"
+    if level == 1:
+        return f"⚠️ Caution: {reasons}"
+    return f"⛔ Stop work at height: {reasons}"
+
+
+# ---------------- Local stub ----------------
+def _stub_weather(lat, lon, now):
+    """
+    Deterministic OpenWeatherMap-shaped reading for a position and time
+    """
+    phase = (lat * 7 + lon * 3 + now / 10800) % (2 * math.pi)
+    temp = round(8 + 6 * math.sin(phase), 2)
+    return {
+        "dt": int(now),
+        "coord": {"lat": lat, "lon": lon},
+        "main": {"temp": temp, "feels_like": round(temp - 2, 2), "humidity": int(75 + 15 * math.cos(phase))},
+        "wind": {"speed": round(6 + 5 * math.cos(phase), 2)},
+        "rain": {"3h": round(max(0.0, 3 * math.sin(phase * 2)), 2)},
+        "weather": [{"description": "light rain" if math.sin(phase * 2) > 0 else "broken clouds",
+                     "icon": "10d" if math.sin(phase * 2) > 0 else "04d"}],
+    }
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """
+    Serves /weather and /forecast like the OpenWeatherMap 2.5 API
+    """
+    delay = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        try:
+            lat, lon = float(query["lat"][0]), float(query["lon"][0])
+        except (KeyError, ValueError):
+            self.send_error(400, "lat and lon are required")
+            return
+
+        time.sleep(self.delay)
+        now = time.time()
+        endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+        if endpoint == "weather":
+            body = _stub_weather(lat, lon, now)
+        elif endpoint == "forecast":
+            start = now - now % 10800 + 10800
+            steps = [_stub_weather(lat, lon, start + i * 10800) for i in range(40)]
+            body = {"cod": "200", "cnt": len(steps), "list": steps,
+                    "city": {"coord": {"lat": lat, "lon": lon}}}
+        else:
+            self.send_error(404)
+            return
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up (timed out) first
+
+    def log_message(self, format, *args):
+        pass
+
+
+def stub_server(port=0, delay=0.0):
+    """
+    Start the stub on 127.0.0.1 in a daemon thread and return the server
+    (its URL is f"http://127.0.0.1:{server.server_port}"). `delay` seconds
+    are added to every response to mimic a slow API.
+    """
+    handler = type("StubHandler", (_StubHandler,), {"delay": delay})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Weather client tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    stub = sub.add_parser("stub", help="serve a local OpenWeatherMap stub")
+    stub.add_argument("--port", type=int, default=8765)
+    stub.add_argument("--delay", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args(argv)
+
+    if args.command == "stub":
+        server = stub_server(args.port, args.delay)
+        print(f"Weather stub on http://127.0.0.1:{server.server_port} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+# word_export.py
+"""
+Work Instructions documents (.docx) for the Works section.
+Kept out of Gaeltec.py so worker processes can import it without
+re-running the Streamlit script.
+"""
+import os
+import re
+import threading
+import time
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from io import BytesIO
+
+import pandas as pd
+from docx import Document
+
+# Run properties matching python-docx for bold, Times New Roman, 12pt
+_DOCX_RPR = (
+    '<w:rPr><w:rFonts w:ascii="Times New Roman" w:hAnsi="Times New Roman"/>'
+    '<w:b/><w:sz w:val="24"/>{highlight}</w:rPr>'
+)
+_DOCX_RUN = '<w:r>' + _DOCX_RPR.format(highlight='') + '<w:t>'
+_DOCX_RUN_RED = '<w:r>' + _DOCX_RPR.format(highlight='<w:highlight w:val="red"/>') + '<w:t>'
+_DOCX_SEPARATOR = '<w:r><w:t> ; </w:t></w:r>'
+_DOCX_PARAGRAPH = '<w:p><w:pPr><w:pStyle w:val="ListBullet"/></w:pPr>'
+# Like python-docx: no <w:t> for empty text around tabs / breaks, and
+# xml:space="preserve" only on text with leading or trailing whitespace
+_EMPTY_T = re.compile(r'<w:t></w:t>')
+_PADDED_T = re.compile(r'<w:t>(\s[^<]*|[^<]*\s)</w:t>')
+
+@lru_cache(maxsize=1)
+def _word_template():
+    """
+    Blank styled document (has the 'List Bullet' style), built once and
+    kept as its zip entries plus document.xml split around the body.
+    """
+    buffer = BytesIO()
+    Document().save(buffer)
+    with zipfile.ZipFile(buffer) as zf:
+        entries = [(info, zf.read(info.filename)) for info in zf.infolist()]
+
+    xml = dict((info.filename, data) for info, data in entries)['word/document.xml'].decode('utf-8')
+    split = xml.index('<w:sectPr')
+    return entries, xml[:split], xml[split:]
+
+def _xml_text(s: pd.Series) -> pd.Series:
+    """
+    Escape text for <w:t>; tabs and line breaks become their own elements
+    and characters XML cannot hold are dropped
+    """
+    return (
+        s.str.replace(r'[\x00-\x08\x0b\x0c\x0e-\x1f]', '', regex=True)
+        .str.replace('&', '&amp;', regex=False)
+        .str.replace('<', '&lt;', regex=False)
+        .str.replace('>', '&gt;', regex=False)
+        .str.replace('\t', '</w:t><w:tab/><w:t>', regex=False)
+        .str.replace('[\r\n]', '</w:t><w:br/><w:t>', regex=True)
+    )
+
+def pole_instructions(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per (pole, instruction text), in document order.
+    Text is "work instruction (comment)"; duplicates within a pole are
+    matched case-insensitively, keeping the first position and the last
+    spelling seen.
+    """
+    df = df.replace(
+        to_replace=["nan", "NaN", "None", None],
+        value=""
+    )
+
+    def column(name):
+        if name not in df.columns:
+            return pd.Series("", index=df.index)
+        return df[name].fillna("").astype(str).str.strip()
+
+    wi = column('Work instructions')
+    comment = column('comment')
+    comment_part = ("(" + comment + ")").where(comment != "", "")
+    text = (wi + " " + comment_part).str.strip()
+
+    items = pd.DataFrame({
+        'order': pd.factorize(df['pole'])[0],
+        'pole': df['pole'],
+        'pole_str': df['pole'].astype(str).str.strip(),
+        'text': text,
+    })
+    items = items[(items['order'] >= 0) & (items['pole_str'] != "") & (items['text'] != "")]
+    items['norm'] = items['text'].str.lower()
+
+    items['text'] = items.groupby(['order', 'norm'], sort=False)['text'].transform('last')
+    items = items.drop_duplicates(['order', 'norm'], keep='first')
+    return items.sort_values('order', kind='stable')[['order', 'pole_str', 'text']]
+
+def poles_to_word(df: pd.DataFrame) -> BytesIO:
+    """
+    Work Instructions document: one bullet per pole listing its
+    deduplicated instructions, with "Erect Pole" highlighted in red.
+    Paragraph XML is generated in bulk and spliced into the body of a
+    blank template; the other parts of the template are copied as-is.
+    """
+    entries, head, tail = _word_template()
+    items = pole_instructions(df)
+
+    paragraphs = []
+    if not items.empty:
+        runs = (
+            pd.Series(_DOCX_RUN, index=items.index)
+            .where(~items['text'].str.contains("Erect Pole", regex=False), _DOCX_RUN_RED)
+            + _xml_text(items['text']) + '</w:t></w:r>'
+        )
+        joined = runs.groupby(items['order'], sort=False).agg(_DOCX_SEPARATOR.join)
+        labels = items.groupby('order', sort=False)['pole_str'].first()
+        paragraphs = (
+            _DOCX_PARAGRAPH + _DOCX_RUN + _xml_text(labels) + ' – </w:t></w:r>'
+            + joined + '</w:p>'
+        )
+
+    body = _PADDED_T.sub(r'<w:t xml:space="preserve">\1</w:t>', _EMPTY_T.sub('', "".join(paragraphs)))
+    document_xml = (head + body + tail).encode('utf-8')
+
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for info, data in entries:
+            zf.writestr(info, document_xml if info.filename == 'word/document.xml' else data)
+    buffer.seek(0)
+    return buffer
+
+
+# --- Per-segment pack ---
+# Below this many segments the pool start-up costs more than it saves
+SEGMENT_POOL_MIN = 8
+# Each worker is a full interpreter with pandas and python-docx loaded,
+# so the pool is small and is shut down once nobody has used it for a while
+SEGMENT_POOL_MAX_WORKERS = 4
+SEGMENT_POOL_IDLE_SECONDS = 120
+
+_pool_lock = threading.Lock()
+_pool = {"executor": None, "busy": 0, "last_used": 0.0, "timer": None}
+
+def _pool_workers() -> int:
+    """
+    Workers for the segment pool: the CPUs this process may run on
+    (not the host's count), at most SEGMENT_POOL_MAX_WORKERS
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on Windows / macOS
+        cpus = os.cpu_count() or 1
+    return min(SEGMENT_POOL_MAX_WORKERS, cpus)
+
+def _acquire_pool() -> ProcessPoolExecutor:
+    """
+    Worker pool shared by every session in this process, started on
+    first use. Spawned (not forked) because the Streamlit server is
+    multi-threaded. Pair with _release_pool.
+    """
+    with _pool_lock:
+        if _pool["executor"] is None:
+            _pool["executor"] = ProcessPoolExecutor(
+                max_workers=_pool_workers(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        _pool["busy"] += 1
+        return _pool["executor"]
+
+def _release_pool(broken: bool = False):
+    """
+    Mark one use of the pool as finished and arm the idle shutdown.
+    A broken pool (a worker died) is dropped so the next call starts afresh.
+    """
+    with _pool_lock:
+        _pool["busy"] -= 1
+        _pool["last_used"] = time.monotonic()
+        if broken:
+            _pool["executor"] = None
+        elif _pool["timer"] is None and _pool["executor"] is not None:
+            _pool["timer"] = threading.Timer(SEGMENT_POOL_IDLE_SECONDS, _shutdown_idle_pool)
+            _pool["timer"].daemon = True
+            _pool["timer"].start()
+
+def _shutdown_idle_pool():
+    with _pool_lock:
+        _pool["timer"] = None
+        executor = _pool["executor"]
+        idle = time.monotonic() - _pool["last_used"]
+        if executor is None:
+            return
+        if _pool["busy"] or idle < SEGMENT_POOL_IDLE_SECONDS:
+            # Used since the timer was armed: check again when it could be idle
+            _pool["timer"] = threading.Timer(SEGMENT_POOL_IDLE_SECONDS - idle, _shutdown_idle_pool)
+            _pool["timer"].daemon = True
+            _pool["timer"].start()
+            return
+        _pool["executor"] = None
+    executor.shutdown(wait=False)
+
+def _segment_docx(df: pd.DataFrame) -> bytes:
+    return poles_to_word(df).getvalue()
+
+def _segment_file_name(segment, used: set) -> str:
+    """
+    Zip entry name for a segment, made filesystem-safe and unique
+    """
+    stem = re.sub(r'[^\w\-. ]', '_', str(segment)).strip() or "segment"
+    name = f"Work_Instructions_{stem}.docx"
+    n = 2
+    while name in used:
+        name = f"Work_Instructions_{stem}_{n}.docx"
+        n += 1
+    used.add(name)
+    return name
+
+def _zip_documents(segments, documents) -> BytesIO:
+    buffer = BytesIO()
+    used = set()
+    # .docx files are already deflated; storing them avoids a second pass
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as zf:
+        for segment, data in zip(segments, documents):
+            zf.writestr(_segment_file_name(segment, used), data)
+    buffer.seek(0)
+    return buffer
+
+def segments_to_zip(df: pd.DataFrame, segment_col: str = 'segmentcode') -> BytesIO:
+    """
+    Zip with one Work Instructions document per segment code.
+    Segments are rendered in a process pool and written to the archive
+    in segment order as each document comes back.
+    """
+    cols = [c for c in ['pole', 'Work instructions', 'comment'] if c in df.columns]
+    segments, frames = [], []
+    for segment, group in df.groupby(segment_col, sort=True):
+        segments.append(segment)
+        frames.append(group[cols])
+
+    workers = _pool_workers()
+    if len(frames) < SEGMENT_POOL_MIN or workers < 2:
+        return _zip_documents(segments, map(_segment_docx, frames))
+
+    chunksize = max(1, len(frames) // (4 * workers))
+    pool = _acquire_pool()
+    broken = False
+    try:
+        return _zip_documents(segments, pool.map(_segment_docx, frames, chunksize=chunksize))
+    except BrokenProcessPool:
+        broken = True
+    finally:
+        _release_pool(broken)
+    return _zip_documents(segments, map(_segment_docx, frames))